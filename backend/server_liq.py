@@ -1,12 +1,20 @@
-import os, json, time, threading, requests
-from websocket import WebSocketApp
+import os, sys, json, math, time, hashlib, asyncio, threading, requests, orjson, websockets
+import numpy as np
+try:
+    from numba import njit
+except ImportError:  # tanpa numba kernel ring jalan sebagai Python biasa
+    def njit(*args, **kwargs): return lambda f: f
+from requests.adapters import HTTPAdapter
 from collections import deque
-from fastapi import FastAPI, Body
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from fastapi import FastAPI, Body, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, ORJSONResponse
 
 # ========= CONFIG =========
-WATCHLIST = [s.strip().upper() for s in os.getenv("WATCHLIST","XRPUSDT,DOGEUSDT,PEPEUSDT").split(",")]
+WATCHLIST = [sys.intern(s.strip().upper()) for s in os.getenv("WATCHLIST","XRPUSDT,DOGEUSDT,PEPEUSDT").split(",")]
+_WATCHLIST_SET = frozenset(WATCHLIST)  # simbol sudah uppercase -> cocok langsung dengan field "s" dari Binance
 
 # Ambang notional (USD) per pair (untuk AI event-level). Override via ENV THRESHOLDS_USD='{"XRPUSDT":7000,...}'
 _DEFAULT_THRESHOLDS_USD = {"XRPUSDT": 7500.0, "DOGEUSDT": 6000.0, "PEPEUSDT": 3000.0}
@@ -34,133 +42,317 @@ BINANCE_API_KEY = os.getenv("7b159c78c7b4d2671a91495bdbbfa96ba08d1e06315a1609b46
 BINANCE_API_SECRET = os.getenv("746efa9aa4afcb9055fe38c8b58ed5f5d6bddf3a910871ce584fca5150c3b960","")
 BINANCE_TESTNET = os.getenv("BINANCE_TESTNET","true").lower() == "true"
 
+# param `symbols` untuk /prices (serialize sekali saja)
+_WATCHLIST_JSON = orjson.dumps(WATCHLIST).decode()
+
 # ========= STATE =========
+@njit(cache=True, fastmath=True)
+def _purge(ts_arr, sign_arr, usd_arr, head, size, buy_sum, sell_sum, n_buy, n_sell, cutoff):
+    # event masuk berurutan waktu -> pop dari tail selama sudah lewat window
+    cap = ts_arr.shape[0]
+    while size:
+        tail = (head - size) % cap
+        if ts_arr[tail] >= cutoff: break
+        if sign_arr[tail] > 0: buy_sum -= usd_arr[tail]; n_buy -= 1
+        else:                  sell_sum -= usd_arr[tail]; n_sell -= 1
+        size -= 1
+    # sisi yang sudah kosong di-nol-kan, buang residu float dari running sum
+    if not n_buy: buy_sum = 0.0
+    if not n_sell: sell_sum = 0.0
+    return size, buy_sum, sell_sum, n_buy, n_sell
+
+@njit(cache=True, fastmath=True)
+def _ingest(ts_arr, sign_arr, usd_arr, head, size, buy_sum, sell_sum, n_buy, n_sell,
+            new_ts, new_sign, new_usd, cutoff):
+    cap = ts_arr.shape[0]
+    for j in range(new_ts.shape[0]):
+        if size == cap:  # slot tertua ditimpa
+            if sign_arr[head] > 0: buy_sum -= usd_arr[head]; n_buy -= 1
+            else:                  sell_sum -= usd_arr[head]; n_sell -= 1
+        else:
+            size += 1
+        ts_arr[head] = new_ts[j]; sign_arr[head] = new_sign[j]; usd_arr[head] = new_usd[j]
+        if new_sign[j] > 0: buy_sum += new_usd[j]; n_buy += 1
+        else:               sell_sum += new_usd[j]; n_sell += 1
+        head = (head + 1) % cap
+    size, buy_sum, sell_sum, n_buy, n_sell = _purge(
+        ts_arr, sign_arr, usd_arr, head, size, buy_sum, sell_sum, n_buy, n_sell, cutoff)
+    return head, size, buy_sum, sell_sum, n_buy, n_sell
+
+class _Ring:
+    """Ring buffer SoA (ts, sign, usd) untuk AI window per simbol. sign: BUY=+1, SELL=-1.
+    buy_sum/sell_sum = total USD hidup, di-update O(1) saat append/expire (kernel _ingest/_purge);
+    n_buy/n_sell = jumlah event hidup per sisi (sum di-reset ke 0.0 saat sisinya kosong)."""
+    __slots__ = ("ts", "sign", "usd", "head", "size", "buy_sum", "sell_sum", "n_buy", "n_sell")
+
+    def __init__(self, cap=3000):
+        self.ts = np.empty(cap, np.float64)
+        self.sign = np.empty(cap, np.int8)
+        self.usd = np.empty(cap, np.float64)
+        self.head = 0   # slot tulis berikutnya
+        self.size = 0   # jumlah event hidup (paling lama = head - size)
+        self.buy_sum = 0.0
+        self.sell_sum = 0.0
+        self.n_buy = 0
+        self.n_sell = 0
+
+    def extend(self, ts, sign, usd, cutoff):
+        self.head, self.size, self.buy_sum, self.sell_sum, self.n_buy, self.n_sell = _ingest(
+            self.ts, self.sign, self.usd, self.head, self.size,
+            self.buy_sum, self.sell_sum, self.n_buy, self.n_sell, ts, sign, usd, cutoff)
+
+    def oldest(self):
+        # ts event hidup tertua (inf kalau kosong)
+        if not self.size: return float("inf")
+        return float(self.ts[(self.head - self.size) % self.ts.shape[0]])
+
+    def purge(self, cutoff):
+        self.size, self.buy_sum, self.sell_sum, self.n_buy, self.n_sell = _purge(
+            self.ts, self.sign, self.usd, self.head, self.size,
+            self.buy_sum, self.sell_sum, self.n_buy, self.n_sell, cutoff)
+
+    def signal(self, th_usd):
+        # O(1): cukup dari running sum ring yang sudah di-purge
+        if not self.size: return {"recommendation":"HOLD","confidence":0}
+        buy_usd, sell_usd = float(self.buy_sum), float(self.sell_sum)
+        total = buy_usd + sell_usd
+        if total <= 0: return {"recommendation":"HOLD","confidence":0}
+        bias = (buy_usd - sell_usd) / total  # -1..+1
+        rec = _RECS[int(np.sign(bias) * (abs(bias) >= 0.08)) + 1]
+        conf = int(np.clip(50 + 45*abs(bias), 10, 95))
+        # bonus kalau salah satu dari 5 event hidup terakhir >= threshold USD
+        k = min(5, self.size)
+        if (self.usd[(self.head - k + np.arange(k)) % self.ts.shape[0]] >= th_usd).any():
+            conf = min(99, conf + 5)
+        return {"recommendation": rec, "confidence": conf}
+
+_last_ts = (None, "")  # (detik, string) terakhir; event beruntun biasanya di detik yang sama
+
+def _fmt_ts(ts_ms):
+    global _last_ts
+    sec = int(ts_ms // 1000)
+    last = _last_ts
+    if last[0] != sec:
+        last = _last_ts = (sec, time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(sec)))
+    return last[1]
+
+class LiqRow:
+    """Satu baris tabel likuidasi (ringkas, tanpa dict per baris). Timestamp diformat saat disajikan."""
+    __slots__ = ("ts_ms", "sym", "side", "price", "qty", "rec", "conf")
+
+    def __init__(self, ts_ms, sym, side, price, qty, rec, conf):
+        self.ts_ms = ts_ms; self.sym = sym; self.side = side
+        self.price = price; self.qty = qty; self.rec = rec; self.conf = conf
+
+    def to_dict(self):
+        return {"timestamp": _fmt_ts(self.ts_ms), "symbol": self.sym, "side": self.side,
+                "price": self.price, "quantity": self.qty,
+                "ai_recommendation": self.rec, "confidence": self.conf}
+
 latest_signals = {s: {"recommendation":"HOLD","confidence":0} for s in WATCHLIST}
 recent_liqs = deque(maxlen=500)
-events_by_sym = {s: deque(maxlen=3000) for s in WATCHLIST}
+events_by_sym = {s: _Ring(3000) for s in WATCHLIST}
 paper_trades = deque(maxlen=200)
 uptime_start = time.time()
 
 # ========= APP =========
-app = FastAPI(title="Binance Liquidation Monitor")
+app = FastAPI(title="Binance Liquidation Monitor", default_response_class=ORJSONResponse)
 app.add_middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"])
 
 # ========= UTILS =========
-def notional(price, qty):
-    try: return float(price) * float(qty)
-    except: return 0.0
-
 def get_th_usd(sym): return float(THRESHOLDS_USD.get(sym.upper(), 5000.0))
 def get_th_qty(sym): return float(QTY_THRESHOLDS.get(sym.upper(), 0.0))
 
+# body JSON statis + ETag: client yang polling dapat 304 tanpa body
+def _etag(body): return '"' + hashlib.sha1(body).hexdigest()[:16] + '"'
+
+def _etag_match(header, etag):
+    # If-None-Match: daftar tag dipisah koma, boleh W/ (weak), atau "*"
+    for tag in header.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"): tag = tag[2:]
+        if tag == "*" or tag == etag: return True
+    return False
+
+def _static_json(request, body, etag):
+    if _etag_match(request.headers.get("if-none-match") or "", etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
+
+# threshold per simbol di-resolve sekali, hot path cukup index dict
+_TH_USD = {s: get_th_usd(s) for s in WATCHLIST}
+_TH_QTY = {s: get_th_qty(s) for s in WATCHLIST}
+
 # ========= AI: rolling window =========
+_RECS = ("SELL", "HOLD", "BUY")  # index = sign(bias) + 1
+
 def compute_signal(sym, now=None):
     now = now or time.time()
-    dq = events_by_sym.get(sym)
-    if not dq: return {"recommendation":"HOLD","confidence":0}
+    ring = events_by_sym.get(sym)
+    if ring is None or not ring.size: return {"recommendation":"HOLD","confidence":0}
     # purge
-    while dq and (now - dq[0][0]) > WINDOW_SEC: dq.popleft()
-    if not dq: return {"recommendation":"HOLD","confidence":0}
-    buy_usd  = sum(usd for t,side,usd in dq if side == "BUY")
-    sell_usd = sum(usd for t,side,usd in dq if side == "SELL")
-    total = buy_usd + sell_usd
-    if total <= 0: return {"recommendation":"HOLD","confidence":0}
-    bias = (buy_usd - sell_usd) / total  # -1..+1
-    if abs(bias) < 0.08: rec = "HOLD"
-    else:                rec = "BUY" if bias > 0 else "SELL"
-    conf = max(10, min(95, int(50 + 45*abs(bias))))
-    try:
-        if any(usd >= get_th_usd(sym) for _,_,usd in list(dq)[-5:]):
-            conf = min(99, conf + 5)
-    except: pass
-    return {"recommendation": rec, "confidence": conf}
+    ring.purge(now - WINDOW_SEC)
+    return ring.signal(_TH_USD[sym])
 
 # ========= WS LOOP =========
-def _ws_loop():
+# WS reader (asyncio) cuma parse + enqueue (1 batch per frame); agregasi AI & tabel di task _aggregator.
+# Queue dibatasi -> kalau aggregator tertinggal, reader ikut menunggu (backpressure eksplisit).
+RAW_QUEUE_MAX = 10000
+_raw_q = None   # asyncio.Queue, dibuat di boot() di event loop yang aktif
+_tasks = []     # referensi task background supaya tidak di-GC
+
+def _parse_frame(msg):
+    data = orjson.loads(msg)
+    events = data if type(data) is list else (data,)
+    rows = []; _append = rows.append; _wl = _WATCHLIST_SET
+    for ev in events:
+        try:
+            o = ev["o"]; sym = o["s"]
+            if sym in _wl: _append((sym, o["S"], o["p"], o["q"], o["T"]))
+        except KeyError:  # event tidak lengkap -> skip
+            pass
+    return rows
+
+async def _ws_loop():
     url = "wss://fstream.binance.com/ws/!forceOrder@arr"
     while True:
         try:
-            def on_msg(ws, msg):
-                try:
-                    data = json.loads(msg)
-                    events = data if isinstance(data, list) else [data]
-                    for ev in events:
-                        o = ev.get("o", {})
-                        sym = (o.get("s") or "").upper()
-                        if sym not in WATCHLIST: continue
-                        side = o.get("S")
-                        price = float(o.get("p") or o.get("ap") or 0)
-                        qty   = float(o.get("q") or o.get("l")  or 0)
-                        ts_ms = int(o.get("T") or ev.get("E") or time.time()*1000)
-                        usd   = notional(price, qty)
-
-                        # simpan untuk AI window
-                        events_by_sym[sym].append((ts_ms/1000.0, side, usd))
-
-                        # event-level AI (notional vs threshold USD)
-                        th_usd = get_th_usd(sym)
-                        if usd >= th_usd:
-                            rec_evt = "SELL" if side == "SELL" else "BUY"
-                            overs = max(0.0, (usd - th_usd)/max(th_usd,1))
-                            conf_evt = max(70, min(95, int(80 + overs*15)))
-                        else:
-                            rec_evt, conf_evt = "HOLD", 0
-
-                        # FILTER TABEL: hanya qty besar per pair (+ optional usd)
-                        if qty >= get_th_qty(sym) and usd >= MIN_TABLE_USD:
-                            recent_liqs.appendleft({
-                                "timestamp": time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(ts_ms/1000)),
-                                "symbol": sym, "side": side, "price": price, "quantity": qty,
-                                "ai_recommendation": rec_evt, "confidence": conf_evt
-                            })
-
-                        # update sinyal realtime dari window
-                        latest_signals[sym] = compute_signal(sym)
-                except Exception:
-                    pass
-            ws = WebSocketApp(url, on_message=on_msg)
-            ws.run_forever(ping_interval=20, ping_timeout=10)
+            async with websockets.connect(url, max_size=2**20, compression=None,
+                                          ping_interval=20, ping_timeout=10) as ws:
+                async for msg in ws:
+                    try: rows = _parse_frame(msg)
+                    except Exception: continue
+                    if rows: await _raw_q.put(rows)
+        except asyncio.CancelledError:
+            raise
         except Exception:
-            time.sleep(3)  # retry
+            await asyncio.sleep(3)  # retry
+
+def _ingest_batch(rows):
+    n = len(rows)
+    syms, sides, prices, qtys, tss = zip(*rows)
+    prices = np.fromiter(prices, np.float64, count=n)
+    qtys   = np.fromiter(qtys, np.float64, count=n)
+    ts     = np.fromiter(tss, np.float64, count=n) / 1000.0
+    usds   = prices * qtys
+    sign   = np.where(np.array(sides) == "BUY", 1, -1).astype(np.int8)
+    th_usd = np.fromiter(map(_TH_USD.__getitem__, syms), np.float64, count=n)
+    th_qty = np.fromiter(map(_TH_QTY.__getitem__, syms), np.float64, count=n)
+
+    # event-level AI (notional vs threshold USD)
+    big = usds >= th_usd
+    rec_evt = sign * big + 1  # index ke _RECS
+    conf_evt = np.clip(80 + (usds - th_usd) / np.maximum(th_usd, 1) * 15, 70, 95).astype(np.int64) * big
+
+    # FILTER TABEL: hanya qty besar per pair (+ optional usd)
+    show = (qtys >= th_qty) & (usds >= MIN_TABLE_USD)
+
+    sym_arr = np.array(syms)
+    now = time.time()
+    # simpan untuk AI window + update sinyal realtime, sekali per simbol per frame
+    for sym in set(syms):
+        idx = np.flatnonzero(sym_arr == sym)
+        ring = events_by_sym[sym]
+        ring.extend(ts[idx], sign[idx], usds[idx], now - WINDOW_SEC)  # extend sudah purge
+        latest_signals[sym] = ring.signal(_TH_USD[sym])
+
+    _appendleft = recent_liqs.appendleft
+    for i in np.flatnonzero(show):
+        _appendleft(LiqRow(
+            int(tss[i]), syms[i], sides[i], float(prices[i]), float(qtys[i]),
+            _RECS[rec_evt[i]], int(conf_evt[i])))
+
+async def _aggregator():
+    while True:
+        rows = await _raw_q.get()
+        try: _ingest_batch(rows)
+        except Exception: pass
+
+def _warmup():
+    # kompilasi kernel numba sekarang, bukan saat event pertama masuk; sekalian cek regresi:
+    # window satu sisi (semua SELL expire, 1 BUY tersisa) harus sell_sum == 0.0 persis, bukan residu float
+    ring = _Ring(8)
+    usd = np.array([0.1, 0.2, 0.3, 1000.0 / 12345.678]) * 12345.678
+    ring.extend(np.array([1.0, 2.0, 3.0, 10.0]), np.array([-1, -1, -1, 1], np.int8), usd, 0.0)
+    ring.purge(5.0)
+    if ring.sell_sum != 0.0 or ring.signal(float("inf"))["confidence"] != 95:
+        raise RuntimeError("ring kernel: running sum tidak bersih setelah satu sisi expire")
 
 @app.on_event("startup")
-def boot():
-    threading.Thread(target=_ws_loop, daemon=True).start()
+async def boot():
+    global _raw_q
+    _warmup()
+    _raw_q = asyncio.Queue(maxsize=RAW_QUEUE_MAX)
+    _tasks.append(asyncio.create_task(_aggregator()))
+    _tasks.append(asyncio.create_task(_ws_loop()))
+    # Client() melakukan request jaringan -> jalan di background, startup & feed tidak menunggu.
+    # Kalau belum selesai/gagal, _get_client() yang coba lagi (dengan backoff).
+    _tasks.append(asyncio.create_task(asyncio.to_thread(_init_client)))
 
 # ========= UI =========
 UI_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "docs", "index.html"))
+try:
+    with open(UI_PATH, "rb") as f: _UI_BYTES = f.read()  # dibaca sekali saat start
+except FileNotFoundError:
+    _UI_BYTES = b"<h1>UI not found.</h1><p>Put docs/index.html in repo.</p>"
+
 @app.get("/", response_class=HTMLResponse)
 def root():
-    try:
-        return open(UI_PATH, "r", encoding="utf-8").read()
-    except FileNotFoundError:
-        return HTMLResponse("<h1>UI not found.</h1><p>Put docs/index.html in repo.</p>", status_code=200)
+    return HTMLResponse(content=_UI_BYTES)
 
 # ========= BASIC API =========
 @app.get("/health")
 def health(): return {"ok": True, "ts": int(time.time()*1000)}
 
+# config statis selama proses hidup -> serialize sekali
+_SYMBOLS_BODY = orjson.dumps({"watchlist": WATCHLIST,
+                              "thresholds_usd": THRESHOLDS_USD,
+                              "qty_thresholds": QTY_THRESHOLDS,
+                              "min_table_usd": MIN_TABLE_USD,
+                              "window_sec": WINDOW_SEC})
+_SYMBOLS_ETAG = _etag(_SYMBOLS_BODY)
+
 @app.get("/symbols")
-def symbols():
-    return {"watchlist": WATCHLIST,
-            "thresholds_usd": THRESHOLDS_USD,
-            "qty_thresholds": QTY_THRESHOLDS,
-            "min_table_usd": MIN_TABLE_USD,
-            "window_sec": WINDOW_SEC}
+def symbols(request: Request):
+    return _static_json(request, _SYMBOLS_BODY, _SYMBOLS_ETAG)
+
+_STATUS_STATIC = {"ai_accuracy": 82, "provider": "binance", "telegram_delivery": 99.1}
 
 @app.get("/status")
 def status():
     up = int(time.time() - uptime_start)
     return {"uptime": time.strftime("%H:%M:%S", time.gmtime(up)),
-            "processed_today": len(recent_liqs),
-            "ai_accuracy": 82, "provider": "binance", "telegram_delivery": 99.1}
+            "processed_today": len(recent_liqs), **_STATUS_STATIC}
 
-@app.get("/prices")
-def prices():
+# koneksi HTTP ke Binance dipakai ulang (tanpa TCP+TLS handshake tiap request)
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+_SESSION.headers["Accept-Encoding"] = "gzip"
+
+# cache singkat /prices: banyak tab/dashboard polling -> 1 fetch ke Binance per TTL
+PRICE_TTL_SEC = 0.5
+_price_cache = {"t": 0.0, "body": None}
+_price_lock = threading.Lock()
+
+def _fetch_one(s):
+    for url in [f"https://api.binance.com/api/v3/ticker/price?symbol={s}",
+                f"https://data-api.binance.vision/api/v3/ticker/price?symbol={s}"]:
+        try:
+            r = _SESSION.get(url, timeout=8); r.raise_for_status()
+            return float(orjson.loads(r.content)["price"]), "binance(per-symbol)"
+        except Exception: pass
+    try:
+        r = _SESSION.get("https://fapi.binance.com/fapi/v1/premiumIndex", params={"symbol": s}, timeout=8)
+        r.raise_for_status()
+        return float(orjson.loads(r.content)["markPrice"]), "binance-futures(mark)"
+    except Exception:
+        return None, "unavailable"
+
+def _fetch_prices():
     def arr(url):
-        r = requests.get(url, params={"symbols": json.dumps(WATCHLIST)}, timeout=8)
+        r = _SESSION.get(url, params={"symbols": _WATCHLIST_JSON}, timeout=8)
         r.raise_for_status()
-        data = r.json()
+        data = orjson.loads(r.content)
         return {it["symbol"]: float(it["price"]) for it in data}
     out, provider = {}, None
     for name, url in [("binance","https://api.binance.com/api/v3/ticker/price"),
@@ -168,61 +360,99 @@ def prices():
         try: out = arr(url); provider = name; break
         except Exception: pass
     if not out:
-        for s in WATCHLIST:
-            ok=False
-            for url in [f"https://api.binance.com/api/v3/ticker/price?symbol={s}",
-                        f"https://data-api.binance.vision/api/v3/ticker/price?symbol={s}"]:
-                try:
-                    r = requests.get(url, timeout=8); r.raise_for_status()
-                    out[s] = float(r.json()["price"]); provider = provider or "binance(per-symbol)"; ok=True; break
-                except Exception: pass
-            if not ok:
-                try:
-                    r = requests.get("https://fapi.binance.com/fapi/v1/premiumIndex", params={"symbol": s}, timeout=8)
-                    r.raise_for_status()
-                    out[s] = float(r.json()["markPrice"]); provider = provider or "binance-futures(mark)"
-                except Exception:
-                    out[s] = None; provider = provider or "unavailable"
+        # fallback per simbol, paralel -> wall time = 1 simbol terburuk, bukan jumlahnya
+        with ThreadPoolExecutor(max_workers=len(WATCHLIST)) as ex:
+            futures = {ex.submit(_fetch_one, s): s for s in WATCHLIST}
+            res = {futures[fut]: fut.result() for fut in as_completed(futures)}
+        # urutan WATCHLIST di response; provider = yang pertama (urut WATCHLIST) yang bukan "unavailable"
+        out = {s: res[s][0] for s in WATCHLIST}
+        provs = [res[s][1] for s in WATCHLIST]
+        provider = next((p for p in provs if p != "unavailable"), "unavailable")
     return {"provider": provider or "unavailable", "prices": out}
 
+@app.get("/prices")
+def prices():
+    if time.time() - _price_cache["t"] >= PRICE_TTL_SEC:
+        with _price_lock:
+            if time.time() - _price_cache["t"] >= PRICE_TTL_SEC:  # cek ulang, mungkin sudah diisi thread lain
+                _price_cache["body"] = orjson.dumps(_fetch_prices())
+                _price_cache["t"] = time.time()
+    return Response(content=_price_cache["body"], media_type="application/json")
+
+_MODEL_NAME = f"liq-window-v1({WINDOW_SEC}s)"
+
+# /analysis & /liquidations sengaja async: jalan di event loop yang sama dengan _aggregator,
+# jadi state window & recent_liqs tidak perlu lock (dan tidak bisa memblok WS reader).
 @app.get("/analysis")
-def analysis():
-    out = {sym: compute_signal(sym) for sym in WATCHLIST}
-    return {"model": f"liq-window-v1({WINDOW_SEC}s)", "signals": out}
+async def analysis():
+    # latest_signals sudah di-update _aggregator; hitung ulang hanya kalau window-nya basi
+    # (tidak ada event baru sementara event tertua sudah lewat WINDOW_SEC)
+    now = time.time()
+    cutoff = now - WINDOW_SEC
+    for sym in WATCHLIST:
+        if events_by_sym[sym].oldest() < cutoff:
+            latest_signals[sym] = compute_signal(sym, now)
+    return {"model": _MODEL_NAME, "signals": dict(latest_signals)}
 
 @app.get("/liquidations")
-def liquidations(limit: int = 50):
-    items = [r for r in list(recent_liqs) if r["symbol"] in WATCHLIST]
-    return items[:limit]
+async def liquidations(limit: int = 50):
+    # producer (_ingest_batch) sudah memfilter WATCHLIST -> ambil `limit` teratas saja
+    return [r.to_dict() for r in islice(recent_liqs, 0, max(limit, 0))]
 
 # ========= PAPER TRADING (Testnet) =========
-def _get_client():
+# Client dibuat di boot(), lalu dipakai ulang oleh semua /paper/*.
+# Client() melakukan request jaringan; kalau gagal, _get_client coba lagi dengan backoff.
+_CLIENT = None
+_client_next_try = 0.0   # kapan boleh coba init lagi
+_client_backoff = 5.0    # detik, dobel tiap gagal (maks 300)
+_client_lock = threading.Lock()
+
+def _init_client():
+    global _CLIENT, _client_next_try, _client_backoff
     if not BINANCE_API_KEY or not BINANCE_API_SECRET:
-        return None
+        return
+    if not _client_lock.acquire(blocking=False):
+        return  # init sedang jalan di thread lain
     try:
+        if _CLIENT is not None: return
         from binance.client import Client
-        c = Client(BINANCE_API_KEY, BINANCE_API_SECRET, testnet=BINANCE_TESTNET)
-        return c
+        _CLIENT = Client(BINANCE_API_KEY, BINANCE_API_SECRET, testnet=BINANCE_TESTNET)
+        _client_backoff = 5.0
     except Exception:
-        return None
+        _client_next_try = time.time() + _client_backoff
+        _client_backoff = min(_client_backoff * 2, 300.0)
+    finally:
+        _client_lock.release()
+
+def _get_client():
+    if _CLIENT is None and time.time() >= _client_next_try:
+        _init_client()
+    return _CLIENT
+
+_PAPER_CONFIG_BODY = orjson.dumps({"enabled": True,  # True karena kita bisa simulasi lokal
+                                   "testnet": BINANCE_TESTNET,
+                                   "has_keys": bool(BINANCE_API_KEY and BINANCE_API_SECRET)})
+_PAPER_CONFIG_ETAG = _etag(_PAPER_CONFIG_BODY)
 
 @app.get("/paper/config")
-def paper_config():
-    return {"enabled": bool(_get_client() or True),  # True karena kita bisa simulasi lokal
-            "testnet": BINANCE_TESTNET,
-            "has_keys": bool(BINANCE_API_KEY and BINANCE_API_SECRET)}
+def paper_config(request: Request):
+    return _static_json(request, _PAPER_CONFIG_BODY, _PAPER_CONFIG_ETAG)
 
 @app.get("/paper/orders")
 def paper_orders(): return list(paper_trades)[:50]
 
 @app.post("/paper/order")
 def paper_order(payload: dict = Body(...)):
-    sym = (payload.get("symbol") or "").upper()
-    side = (payload.get("side") or "").upper()
-    qty  = float(payload.get("quantity") or 0)
-    assert sym in WATCHLIST, "symbol not in WATCHLIST"
-    assert side in ("BUY","SELL"), "side must be BUY/SELL"
-    assert qty > 0, "quantity must be > 0"
+    sym = payload.get("symbol") or ""
+    side = payload.get("side") or ""
+    if not isinstance(sym, str):  raise HTTPException(400, "symbol not in WATCHLIST")
+    if not isinstance(side, str): raise HTTPException(400, "side must be BUY/SELL")
+    sym, side = sym.upper(), side.upper()
+    try: qty = float(payload.get("quantity") or 0)
+    except (TypeError, ValueError): qty = 0.0
+    if sym not in _WATCHLIST_SET:            raise HTTPException(400, "symbol not in WATCHLIST")
+    if side not in ("BUY","SELL"):           raise HTTPException(400, "side must be BUY/SELL")
+    if not (math.isfinite(qty) and qty > 0): raise HTTPException(400, "quantity must be > 0")
     client = _get_client()
     ts = int(time.time()*1000)
 